@@ -25,8 +25,6 @@ Binary discovery:
 
 __version__ = "0.1.0"
 
-from .kernel import KleisKernel
-from .numeric_kernel import KleisNumericKernel
 from .kleisdoc_shell import compile_to_pdf, compile_to_typst, list_templates, validate
 from .equation_editor import equation_editor, EquationEditorWidget
 from .kleis_binary import (
@@ -35,6 +33,25 @@ from .kleis_binary import (
     get_status as get_kleis_status
 )
 
+# The kernel classes pull in ipykernel, which dominates import time.
+# Load them on first access (PEP 562) so document helpers such as
+# `from kleis_kernel import compile_to_pdf` stay cheap to import.
+_LAZY_KERNELS = {
+    "KleisKernel": ".kernel",
+    "KleisNumericKernel": ".numeric_kernel",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_KERNELS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     "KleisKernel", 
     "KleisNumericKernel", 
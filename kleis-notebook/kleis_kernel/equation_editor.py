@@ -27,16 +27,29 @@ Prerequisites:
     $ cargo run --bin kleis -- server --port 3000
 """
 
-from IPython.display import display, HTML, Javascript
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple
 import json
 import uuid
 
+# IPython.display is imported where it is used: it takes a few hundred ms
+# to import and would otherwise be paid by every `import kleis_kernel`
+if TYPE_CHECKING:
+    from IPython.display import HTML
+
 
 # Default server port where kleis server runs
 # This serves the Equation Editor at static/index.html
 DEFAULT_KLEIS_PORT = 3000
 
+# Seconds a check_server() result is reused before probing again. A
+# "not running" result expires sooner so a freshly started server is
+# picked up quickly.
+SERVER_CHECK_TTL = 30.0
+SERVER_CHECK_NEGATIVE_TTL = 5.0
+
+# Cache for check_server(): port -> (running, time.monotonic() expiry)
+_server_check_cache: Dict[int, Tuple[bool, float]] = {}
+
 
 def equation_editor(
     initial: Optional[Dict[str, Any]] = None,
@@ -44,7 +57,7 @@ def equation_editor(
     width: str = "100%",
     height: str = "700px",
     show_immediately: bool = True
-) -> HTML:
+) -> "HTML":
     """
     Display the Kleis Equation Editor in the Jupyter notebook.
     
@@ -72,6 +85,8 @@ def equation_editor(
         eq_ast = {"Operation": {"name": "equals", "args": [...]}}
         equation_editor(initial=eq_ast)
     """
+    from IPython.display import HTML
+    
     widget_id = f"kleis-eq-editor-{uuid.uuid4().hex[:8]}"
     receiver_id = f"kleis-receiver-{uuid.uuid4().hex[:8]}"
     
@@ -79,6 +94,9 @@ def equation_editor(
     # Adding ?mode=jupyter signals the editor to enable Jupyter-specific behavior
     editor_url = f"http://localhost:{port}/?mode=jupyter"
     
+    # Serialize the initial AST once; it is embedded twice in the script below
+    initial_json = json.dumps(initial) if initial else 'null'
+    
     initial_display = "block" if show_immediately else "none"
     button_display = "none" if show_immediately else "inline-block"
     
@@ -147,7 +165,7 @@ def equation_editor(
             if (event.data && event.data.type === 'kleisRequestInitial') {{
                 var iframe = document.getElementById('{widget_id}-frame');
                 if (iframe && iframe.contentWindow) {{
-                    var initialData = {json.dumps(initial) if initial else 'null'};
+                    var initialData = {initial_json};
                     if (initialData) {{
                         iframe.contentWindow.postMessage({{
                             type: 'kleisInitialData',
@@ -162,7 +180,7 @@ def equation_editor(
         var iframe = document.getElementById('{widget_id}-frame');
         if (iframe) {{
             iframe.onload = function() {{
-                var initialData = {json.dumps(initial) if initial else 'null'};
+                var initialData = {initial_json};
                 if (initialData) {{
                     // Give the editor a moment to initialize
                     setTimeout(function() {{
@@ -207,7 +225,7 @@ class EquationEditorWidget:
         self.result: Optional[Dict[str, Any]] = None
         self._widget_id = f"kleis-widget-{uuid.uuid4().hex[:8]}"
     
-    def display(self) -> HTML:
+    def display(self) -> "HTML":
         """Display the equation editor."""
         return equation_editor(
             initial=self.initial, 
@@ -236,22 +254,40 @@ class EquationEditorWidget:
         )._repr_html_()
 
 
-def check_server(port: int = DEFAULT_KLEIS_PORT) -> bool:
+def check_server(port: int = DEFAULT_KLEIS_PORT, use_cache: bool = True) -> bool:
     """
     Check if the kleis server is running.
     
+    Uses a plain TCP connect (no HTTP round-trip) and reuses the result
+    per port for SERVER_CHECK_TTL seconds (SERVER_CHECK_NEGATIVE_TTL if
+    the server was not running).
+    
     Args:
         port: Port to check (default: 3000)
+        use_cache: If True, return a recent cached result if available.
+                   Set to False to force a fresh probe.
     
     Returns:
         True if server is accessible, False otherwise
     """
-    import urllib.request
+    import socket
+    import time
+    
+    now = time.monotonic()
+    cached = _server_check_cache.get(port)
+    if use_cache and cached is not None and now < cached[1]:
+        return cached[0]
+    
     try:
-        urllib.request.urlopen(f"http://localhost:{port}/", timeout=2)
-        return True
-    except Exception:
-        return False
+        sock = socket.create_connection(("localhost", port), timeout=0.2)
+        sock.close()
+        running = True
+    except OSError:
+        running = False
+    
+    ttl = SERVER_CHECK_TTL if running else SERVER_CHECK_NEGATIVE_TTL
+    _server_check_cache[port] = (running, now + ttl)
+    return running
 
 
 def start_server_instructions() -> str:
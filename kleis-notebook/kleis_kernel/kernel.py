@@ -19,6 +19,22 @@ try:
 except ImportError:
     from kleis_binary import find_kleis_binary, find_kleis_root
 
+# Top-level declarations that should persist in the session context.
+# One alternation scans the cell once instead of once per keyword.
+_DEFINITION_RE = re.compile(
+    r"^\s*(?:"
+    r"(?:structure|data|operation|define|import|implements)\s+"
+    r"|type\s+\w+\s*="
+    r")",
+    re.MULTILINE,
+)
+
+# Cells containing example blocks run in `kleis test` mode
+_EXAMPLE_RE = re.compile(r"^\s*example\s+", re.MULTILINE)
+
+# Word being completed (immediately before the cursor)
+_COMPLETION_WORD_RE = re.compile(r"(\w+)$")
+
 
 class KleisKernel(Kernel):
     """Jupyter kernel for the Kleis mathematical specification language."""
@@ -86,7 +102,8 @@ Jupyter Commands:
 
         # Auto-detect mode based on content
         if mode == "auto":
-            if re.search(r'^\s*example\s+', code, re.MULTILINE):
+            # Cheap substring test first; most eval cells have no example
+            if "example" in code and _EXAMPLE_RE.search(code):
                 mode = "test"
             elif self._is_definition(code):
                 mode = "test"  # Definitions need test mode to validate
@@ -188,9 +205,6 @@ Jupyter Commands:
             else:
                 svg_data = svg_content.strip()
             
-            # Also get any text before the SVG (like out() messages)
-            text_before = output[:output.index("PLOT_SVG:")].strip()
-            
             result = {
                 "data": {
                     "image/svg+xml": svg_data,
@@ -206,15 +220,16 @@ Jupyter Commands:
             if not line.strip():
                 continue
 
-            if line.startswith("✅") or "passed" in line.lower():
+            lower = line.lower()
+            if line.startswith("✅") or "passed" in lower:
                 html_lines.append(
                     f'<div style="color: #28a745; font-family: monospace;">{self._escape_html(line)}</div>'
                 )
-            elif line.startswith("❌") or "failed" in line.lower():
+            elif line.startswith("❌") or "failed" in lower:
                 html_lines.append(
                     f'<div style="color: #dc3545; font-family: monospace;">{self._escape_html(line)}</div>'
                 )
-            elif "error" in line.lower():
+            elif "error" in lower:
                 html_lines.append(
                     f'<div style="color: #dc3545; font-family: monospace; font-weight: bold;">{self._escape_html(line)}</div>'
                 )
@@ -272,20 +287,7 @@ Jupyter Commands:
 
     def _is_definition(self, code: str) -> bool:
         """Check if the code contains definitions that should persist."""
-        definition_patterns = [
-            r"^\s*structure\s+",
-            r"^\s*data\s+",
-            r"^\s*operation\s+",
-            r"^\s*define\s+",
-            r"^\s*import\s+",
-            r"^\s*implements\s+",
-            r"^\s*type\s+\w+\s*=",
-        ]
-
-        for pattern in definition_patterns:
-            if re.search(pattern, code, re.MULTILINE):
-                return True
-        return False
+        return _DEFINITION_RE.search(code) is not None
 
     def do_execute(
         self,
@@ -337,25 +339,26 @@ Jupyter Commands:
             combined = stdout + stderr
             
             # Check for SVG plot output - handle MULTIPLE plots
-            if "PLOT_SVG:" in combined:
-                # Find all PLOT_SVG markers and extract each plot
-                remaining = combined
-                
-                while "PLOT_SVG:" in remaining:
-                    svg_idx = remaining.index("PLOT_SVG:")
-                    text_before = remaining[:svg_idx].strip()
-                    svg_raw = remaining[svg_idx + 9:]  # Everything after PLOT_SVG:
-                    
+            svg_idx = combined.find("PLOT_SVG:")
+            if svg_idx != -1:
+                # Find all PLOT_SVG markers and extract each plot in one
+                # forward scan (offsets into combined, no re-slicing)
+                pos = 0
+
+                while svg_idx != -1:
+                    text_before = combined[pos:svg_idx].strip()
+                    svg_start = svg_idx + 9  # Everything after PLOT_SVG:
+
                     # Find the end of this SVG (</svg> tag)
-                    svg_end_idx = svg_raw.find("</svg>")
+                    svg_end_idx = combined.find("</svg>", svg_start)
                     if svg_end_idx != -1:
-                        svg_data = svg_raw[:svg_end_idx + 6].strip()  # +6 for "</svg>"
-                        remaining = svg_raw[svg_end_idx + 6:]  # Continue after this SVG
+                        pos = svg_end_idx + 6  # +6 for "</svg>"
                     else:
                         # No closing tag found - use all remaining content
-                        svg_data = svg_raw.strip()
-                        remaining = ""
-                    
+                        pos = len(combined)
+                    svg_data = combined[svg_start:pos].strip()
+                    svg_idx = combined.find("PLOT_SVG:", pos)
+
                     # Send any text output before this plot
                     if text_before:
                         # Filter out test summary lines for cleaner output
@@ -382,6 +385,7 @@ Jupyter Commands:
                     })
                 
                 # Send any remaining text after the last plot
+                remaining = combined[pos:]
                 if remaining.strip():
                     # Filter test summary
                     text_lines = [
@@ -448,8 +452,8 @@ Jupyter Commands:
         context = "\n".join(self._session_context)
         
         if cmd == "eval":
-            # For eval, just evaluate the expression
-            full_code = f"{context}\n\n// Evaluate expression\n" if context else ""
+            # For eval, just evaluate the expression (_run_kleis_eval
+            # loads the session context itself)
             return self._run_kleis_eval(expr)
         elif cmd == "type":
             # For type, we need to use the kleis binary with a special approach
@@ -610,7 +614,7 @@ Jupyter Commands:
     def do_complete(self, code: str, cursor_pos: int) -> Dict[str, Any]:
         """Provide code completion."""
         code_to_cursor = code[:cursor_pos]
-        match = re.search(r"(\w+)$", code_to_cursor)
+        match = _COMPLETION_WORD_RE.search(code_to_cursor)
 
         if not match:
             return {
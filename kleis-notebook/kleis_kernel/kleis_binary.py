@@ -43,6 +43,22 @@ from typing import Optional, Tuple
 _cached_binary: Optional[str] = None
 _cached_root: Optional[str] = None
 _cache_initialized: bool = False
+# Environment the cached paths were found under (KLEIS_ROOT, PATH)
+_cached_env: Optional[Tuple[Optional[str], Optional[str]]] = None
+
+
+def _drop_stale_cache() -> None:
+    """Forget cached paths if KLEIS_ROOT or PATH changed since discovery.
+    
+    The binary and the root are dropped together, so a new binary is
+    never paired with a root found under the old environment.
+    """
+    global _cached_binary, _cached_root, _cached_env
+    search_env = (os.environ.get("KLEIS_ROOT"), os.environ.get("PATH"))
+    if search_env != _cached_env:
+        _cached_binary = None
+        _cached_root = None
+        _cached_env = search_env
 
 
 def find_kleis_binary(use_cache: bool = True) -> Optional[str]:
@@ -65,6 +81,10 @@ def find_kleis_binary(use_cache: bool = True) -> Optional[str]:
     """
     global _cached_binary, _cache_initialized
     
+    # A found binary is reused while KLEIS_ROOT and PATH are unchanged.
+    # "Not found" is never cached: a miss costs a few stat calls, and the
+    # binary may appear later (e.g. after cargo build)
+    _drop_stale_cache()
     if use_cache and _cache_initialized and _cached_binary is not None:
         return _cached_binary
     
@@ -122,6 +142,7 @@ def find_kleis_root(use_cache: bool = True) -> Optional[str]:
     """
     global _cached_root, _cache_initialized
     
+    _drop_stale_cache()
     if use_cache and _cache_initialized and _cached_root is not None:
         return _cached_root
     
@@ -189,16 +210,21 @@ def find_kleis_binary_and_root(use_cache: bool = True) -> Tuple[Optional[str], O
 
 def clear_cache():
     """Clear the cached paths, forcing re-discovery on next call."""
-    global _cached_binary, _cached_root, _cache_initialized
+    global _cached_binary, _cached_root, _cache_initialized, _cached_env
     _cached_binary = None
     _cached_root = None
     _cache_initialized = False
+    _cached_env = None
 
 
 def _is_valid_kleis_binary(path: str) -> bool:
     """Test if a path is a valid kleis binary."""
     if not path:
         return False
+    # Cheap filesystem check first: most candidates simply don't exist,
+    # and spawning a process just to find that out costs a fork+exec
+    if not (os.path.isfile(path) and os.access(path, os.X_OK)):
+        return False
     try:
         result = subprocess.run(
             [path, "--version"],
@@ -213,14 +239,11 @@ def _is_valid_kleis_binary(path: str) -> bool:
 
 def _is_valid_kleis_root(path: str) -> bool:
     """Test if a path is a valid Kleis project root."""
-    if not path or not os.path.isdir(path):
-        return False
-    # Check for stdlib directory (required)
-    stdlib_path = os.path.join(path, "stdlib")
-    if not os.path.isdir(stdlib_path):
+    if not path:
         return False
-    # Check for prelude.kleis (sanity check)
-    prelude_path = os.path.join(stdlib_path, "prelude.kleis")
+    # A root has stdlib/prelude.kleis; one stat of that file also implies
+    # that the root and stdlib/ directories exist
+    prelude_path = os.path.join(path, "stdlib", "prelude.kleis")
     return os.path.isfile(prelude_path)
 
 
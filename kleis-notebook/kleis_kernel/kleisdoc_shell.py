@@ -24,10 +24,13 @@ Usage:
     compile_to_pdf("my_thesis.kleis", "my_thesis.pdf")
 """
 
+import hashlib
 import subprocess
 import os
-from pathlib import Path
-from typing import Optional
+import re
+import stat
+import tempfile
+from typing import Dict, List, Optional, Tuple
 
 # Import kleis_binary module
 try:
@@ -35,8 +38,75 @@ try:
 except ImportError:
     from kleis_binary import find_kleis_binary, find_kleis_root
 
+# Escape sequences Kleis uses when printing strings: \n, \" and \\
+_KLEIS_ESCAPE_RE = re.compile(r'\\([n"\\])')
+_KLEIS_UNESCAPES = {"n": "\n", '"': '"', "\\": "\\"}
 
-def compile_to_typst(kleis_file: str) -> Optional[str]:
+# Cache for list_templates(): template dir -> (dir mtime_ns, names)
+_template_list_cache: Dict[str, Tuple[int, List[str]]] = {}
+
+
+def _unescape_match(match: re.Match) -> str:
+    """Replacement for one escape sequence matched by _KLEIS_ESCAPE_RE."""
+    return _KLEIS_UNESCAPES[match.group(1)]
+
+
+# Cache for compile_to_typst(): document path -> (source digest, Typst)
+_typst_cache: Dict[str, Tuple[bytes, str]] = {}
+
+# `import "path"` statements, matched on the raw bytes of a .kleis file
+_IMPORT_RE = re.compile(rb'^\s*import\s+"([^"]+)"', re.MULTILINE)
+
+
+def _resolve_import(import_path: str, base_dir: str) -> str:
+    """
+    Resolve an import the way `kleis test` does (load_imports_recursive in
+    src/bin/kleis.rs): stdlib/ paths against the cwd, others against the
+    importing file's directory, then canonicalized.
+    """
+    if os.path.isabs(import_path):
+        resolved = import_path
+    elif import_path.startswith("stdlib/"):
+        resolved = os.path.abspath(import_path)
+    else:
+        resolved = os.path.join(base_dir, import_path)
+    return os.path.realpath(resolved)
+
+
+def _source_digest(kleis_file: str, kleis_path: str) -> Optional[bytes]:
+    """
+    Digest of a document, everything it imports (transitively) and the
+    kleis binary that compiles it. Returns None (don't cache) if a file
+    can't be read, so that kleis itself gets to report the problem, or if
+    the output may depend on data files read at run time.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        # A rebuilt binary may render the same source differently
+        h.update(f"{kleis_path}\0{os.stat(kleis_path).st_mtime_ns}\0".encode())
+        seen = set()
+        pending = [os.path.realpath(kleis_file)]
+        while pending:
+            path = pending.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            with open(path, "rb") as f:
+                source = f.read()
+            if b"readFile" in source:
+                return None
+            h.update(path.encode("utf-8", "surrogateescape") + b"\0")
+            h.update(source)
+            base_dir = os.path.dirname(path)
+            for match in _IMPORT_RE.finditer(source):
+                import_path = match.group(1).decode("utf-8", "surrogateescape")
+                pending.append(_resolve_import(import_path, base_dir))
+    except OSError:
+        return None
+    return h.digest()
+
+
+def compile_to_typst(kleis_file: str, use_cache: bool = True) -> Optional[str]:
     """
     Compile a Kleis document to Typst code.
     
@@ -49,8 +119,14 @@ def compile_to_typst(kleis_file: str) -> Optional[str]:
     
     Kleis handles all imports (stdlib, user files, etc.).
     
+    Results are cached per document. While the file, the files it
+    imports and the kleis binary are unchanged, the cached Typst is
+    returned without running kleis again.
+    
     Args:
         kleis_file: Path to the .kleis document
+        use_cache: If False, always recompile (the result still refreshes
+                   the cache)
     
     Returns:
         Typst code as a string, or None if failed
@@ -65,6 +141,13 @@ def compile_to_typst(kleis_file: str) -> Optional[str]:
     if kleis_root:
         env["KLEIS_ROOT"] = kleis_root
     
+    cache_key = os.path.abspath(kleis_file)
+    digest = _source_digest(kleis_file, kleis_path)
+    if use_cache and digest is not None:
+        cached = _typst_cache.get(cache_key)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+    
     try:
         result = subprocess.run(
             [kleis_path, "test", kleis_file],
@@ -115,11 +198,11 @@ def compile_to_typst(kleis_file: str) -> Optional[str]:
         if content.endswith('"'):
             content = content[:-1]
         
-        # Unescape the content
-        typst = content.replace('\\n', '\n')
-        typst = typst.replace('\\"', '"')
-        typst = typst.replace('\\\\', '\\')
+        # Unescape the content in a single pass
+        typst = _KLEIS_ESCAPE_RE.sub(_unescape_match, content)
         
+        if digest is not None:
+            _typst_cache[cache_key] = (digest, typst)
         return typst
         
     except subprocess.TimeoutExpired:
@@ -130,13 +213,16 @@ def compile_to_typst(kleis_file: str) -> Optional[str]:
         return None
 
 
-def compile_to_pdf(kleis_file: str, output_pdf: str) -> bool:
+def compile_to_pdf(kleis_file: str, output_pdf: str, keep_typst: bool = True) -> bool:
     """
     Compile a Kleis document to PDF via Typst.
     
     Args:
         kleis_file: Path to the .kleis document
         output_pdf: Path for the output PDF
+        keep_typst: If True, also write the Typst source next to the PDF
+                    (same name, .typ extension). If False, pipe the source
+                    to typst on stdin and skip the intermediate file.
     
     Returns:
         True if successful
@@ -145,17 +231,51 @@ def compile_to_pdf(kleis_file: str, output_pdf: str) -> bool:
     if not typst_code:
         return False
     
-    # Write Typst to file
-    typst_path = output_pdf.replace(".pdf", ".typ")
-    with open(typst_path, "w") as f:
-        f.write(typst_code)
+    if keep_typst:
+        # Swap only the extension; str.replace would also rewrite ".pdf"
+        # elsewhere in the path (e.g. "build.pdfs/thesis.pdf")
+        typst_path = os.path.splitext(output_pdf)[0] + ".typ"
+        # Write Typst to file via a uniquely named temp file + rename, so
+        # a concurrent reader or an interrupted write never sees a
+        # truncated .typ, and concurrent exports don't share a temp file
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(typst_path) or ".", suffix=".typ.tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(typst_code.encode("utf-8"))
+            # mkstemp creates the file owner-only; give it the mode the
+            # .typ already has, or else what open() would (0666 & ~umask)
+            try:
+                mode = stat.S_IMODE(os.stat(typst_path).st_mode)
+            except FileNotFoundError:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o666 & ~umask
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, typst_path)
+        finally:
+            # Only left behind if the write, chmod or replace failed
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        cmd = ["typst", "compile", typst_path, output_pdf]
+        stdin_source = None
+    else:
+        # Read the source from stdin ("-"). Rooting typst at the PDF's
+        # directory resolves relative paths as for a .typ written there.
+        pdf_dir = os.path.dirname(os.path.abspath(output_pdf))
+        cmd = ["typst", "compile", "--root", pdf_dir, "-", output_pdf]
+        stdin_source = typst_code
     
     # Compile with Typst
     try:
         result = subprocess.run(
-            ["typst", "compile", typst_path, output_pdf],
-            capture_output=True,
-            text=True,
+            cmd,
+            input=stdin_source,
+            # Only stderr is reported; don't buffer progress output
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
             timeout=60
         )
         if result.returncode == 0:
@@ -214,10 +334,31 @@ def list_templates() -> list:
     if not kleis_root:
         return []
     
-    template_dir = Path(kleis_root) / "stdlib" / "templates"
-    if template_dir.exists():
-        return [f.stem for f in template_dir.glob("*.kleis")]
-    return []
+    template_dir = os.path.join(kleis_root, "stdlib", "templates")
+    try:
+        mtime = os.stat(template_dir).st_mtime_ns
+    except OSError:
+        return []
+    
+    # Adding, removing or renaming a template bumps the directory mtime,
+    # so an unchanged mtime means the cached listing is still current
+    cached = _template_list_cache.get(template_dir)
+    if cached is not None and cached[0] == mtime:
+        return list(cached[1])
+    
+    # One scandir pass: no per-entry Path objects
+    try:
+        with os.scandir(template_dir) as entries:
+            templates = [
+                entry.name[:-len(".kleis")]
+                for entry in entries
+                if entry.name.endswith(".kleis") and entry.is_file()
+            ]
+    except OSError:
+        return []
+    
+    _template_list_cache[template_dir] = (mtime, templates)
+    return list(templates)
 
 
 # Convenience aliases
@@ -26,6 +26,9 @@ try:
 except ImportError:
     from kleis_binary import find_kleis_binary
 
+# Word being completed (immediately before the cursor)
+_COMPLETION_WORD_RE = re.compile(r"(\w+)$")
+
 
 class KleisNumericKernel(Kernel):
     """Jupyter kernel for Kleis numerical computation via REPL."""
@@ -201,15 +204,16 @@ Jupyter Commands:
             if not line.strip():
                 continue
 
-            if line.startswith("✅") or "passed" in line.lower():
+            lower = line.lower()
+            if line.startswith("✅") or "passed" in lower:
                 html_lines.append(
                     f'<div style="color: #28a745; font-family: monospace;">{self._escape_html(line)}</div>'
                 )
-            elif line.startswith("❌") or "failed" in line.lower():
+            elif line.startswith("❌") or "failed" in lower:
                 html_lines.append(
                     f'<div style="color: #dc3545; font-family: monospace;">{self._escape_html(line)}</div>'
                 )
-            elif "error" in line.lower():
+            elif "error" in lower:
                 html_lines.append(
                     f'<div style="color: #dc3545; font-family: monospace; font-weight: bold;">{self._escape_html(line)}</div>'
                 )
@@ -305,7 +309,8 @@ Jupyter Commands:
                 )
 
         # Check for errors
-        is_error = "error" in output.lower() and not "no error" in output.lower()
+        output_lower = output.lower()
+        is_error = "error" in output_lower and not "no error" in output_lower
 
         return {
             "status": "error" if is_error else "ok",
@@ -376,7 +381,7 @@ Jupyter Commands:
     def do_complete(self, code: str, cursor_pos: int) -> Dict[str, Any]:
         """Provide code completion."""
         code_to_cursor = code[:cursor_pos]
-        match = re.search(r"(\w+)$", code_to_cursor)
+        match = _COMPLETION_WORD_RE.search(code_to_cursor)
 
         if not match:
             return {